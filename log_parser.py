@@ -0,0 +1,97 @@
+import re
+import os
+import mmap
+import multiprocessing
+import pandas as pd
+
+# 正则表达式模式（bytes）：直接在 mmap 的原始字节上匹配，只解码捕获到的字段
+# (?m)^ 锚定行首，避免在不匹配的行上逐位置回溯；各字段都不跨越换行；
+# pid/tid 下游不用，不再捕获
+log_pattern = re.compile(
+    rb"(?m)^\[(?P<time>[^\]\n]+)\][^\S\n]+"
+    rb"\[:error\][^\S\n]+"
+    rb"\[pid[^\S\n]+\d+:tid[^\S\n]+\d+\][^\S\n]+"
+    rb"\[client[^\S\n]+(?P<ip>[\d\.]+):(?P<port>\d+)\][^\S\n]+"
+    rb"script[^\S\n]+'(?P<script>[^'\n]+)'"
+)
+
+# 正则命名分组 -> DataFrame 列名（按分组在正则中的顺序）
+COLUMNS = {"time": "time_raw", "ip": "client_ip", "port": "client_port", "script": "script"}
+TIME_FORMAT = "%a %b %d %H:%M:%S.%f %Y"
+CATEGORY_COLUMNS = ["client_ip", "script"]
+
+# 并行解析的进程数；文件小于 JOBS 个 MIN_CHUNK_SIZE 时相应减少进程，小文件不开进程池
+JOBS = os.cpu_count() or 1
+MIN_CHUNK_SIZE = 16 << 20
+# 无法 mmap 时每次读入的块大小
+READ_BLOCK_SIZE = 16 << 20
+
+def build_frame(found: list) -> pd.DataFrame:
+    # found 为 findall 返回的 bytes 元组列表；先转置成各列再构建，不走逐行推断
+    fields = list(zip(*found)) or [()] * len(COLUMNS)
+    df = pd.DataFrame({
+        name: pd.Series(values, dtype=object).str.decode('utf-8', 'ignore')
+        for name, values in zip(COLUMNS.values(), fields)
+    })
+    # 无法解析的时间置为 NaT，后续清洗时丢弃；cache 让重复的时间串只解析一次
+    time_dt = pd.to_datetime(df["time_raw"], format=TIME_FORMAT, errors='coerce', cache=True)
+    df.insert(1, "time_dt", time_dt)
+    return df
+
+def next_line_start(mm: mmap.mmap, pos: int) -> int:
+    # pos 处或之后的第一个行首，没有则为文件末尾
+    if pos <= 0:
+        return 0
+    i = mm.find(b'\n', pos - 1)
+    return i + 1 if i != -1 else len(mm)
+
+def parse_chunk(path: str, start: int, end: int) -> pd.DataFrame:
+    # 解析起始字节落在 [start, end) 内的所有行
+    with open(path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        begin, stop = next_line_start(mm, start), next_line_start(mm, end)
+        found = log_pattern.findall(mm, begin, stop)
+    return build_frame(found)
+
+def parse_stream(f) -> pd.DataFrame:
+    # 按块读入二进制并在最后一个换行处切分，不完整的末行留到下一块
+    found = []
+    tail = b''
+    while True:
+        buf = f.read(READ_BLOCK_SIZE)
+        if not buf:
+            break
+        buf = tail + buf
+        cut = buf.rfind(b'\n') + 1
+        found += log_pattern.findall(buf, 0, cut)
+        tail = buf[cut:]
+    found += log_pattern.findall(tail)
+    return build_frame(found)
+
+def as_category(values: pd.Series) -> pd.Series:
+    # 类别按首次出现的顺序排列并去掉未出现的类别：value_counts 计数相同时按类别顺序输出，
+    # 这样并列项的先后与普通字符串列（按首次出现）一致
+    if not isinstance(values.dtype, pd.CategoricalDtype):
+        values = values.astype('category')
+    codes = pd.unique(values.cat.codes.to_numpy())
+    return values.cat.set_categories(values.cat.categories[codes[codes >= 0]])
+
+def parse_file(path: str, jobs: int = JOBS) -> pd.DataFrame:
+    size = os.path.getsize(path)
+    n = max(min(jobs, size // MIN_CHUNK_SIZE), 1)
+    if size == 0:
+        # 空文件、管道等大小为 0 的输入无法 mmap，改为流式读取
+        with open(path, 'rb') as f:
+            df = parse_stream(f)
+    elif n == 1:
+        df = parse_chunk(path, 0, size)
+    else:
+        bounds = [size * i // n for i in range(n + 1)]
+        # starmap 按块顺序返回，保证行顺序与原文件一致
+        with multiprocessing.Pool(n) as pool:
+            parts = pool.starmap(parse_chunk, [(path, s, e) for s, e in zip(bounds, bounds[1:])])
+        df = pd.concat(parts, ignore_index=True)
+    # IP 与路径重复度高，转为 category 后去重、统计都在整数编码上进行；
+    # 必须在合并各块之后转换，否则各块类别不同，concat 会退化为 object
+    for col in CATEGORY_COLUMNS:
+        df[col] = as_category(df[col])
+    return df
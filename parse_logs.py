@@ -1,36 +1,87 @@
 import re
 import pandas as pd
-from datetime import datetime
-from sklearn.feature_extraction.text import CountVectorizer
+import numpy as np
 import os
+from log_parser import as_category, parse_file
+
+# pyarrow 可选：有则用其 C++ 多线程写入器输出 CSV，并额外保存一份 Parquet
+try:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    import pyarrow.csv as pa_csv
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = None
 
 LOG_FILE = 'error.log'
 
-# 正则表达式模式
-log_pattern = re.compile(
-    r"\[(?P<time>[^\]]+)\]\s+"
-    r"\[:error\]\s+"
-    r"\[pid\s+(?P<pid>\d+):tid\s+(?P<tid>\d+)\]\s+"
-    r"\[client\s+(?P<ip>[\d\.]+):(?P<port>\d+)\]\s+"
-    r"script\s+'(?P<script>[^']+)'"
-)
+# 分词规则：与 sklearn CountVectorizer 默认一致 / 按斜杠分割路径
+DEFAULT_TOKEN_PATTERN = re.compile(r"(?u)\b\w\w+\b")
+PATH_TOKEN_PATTERN = re.compile(r'[^/]+')
+
+# 敏感文件关键词，合成一个忽略大小写的正则，一次扫描整列
+SENSITIVE_KEYWORDS = ['admin', 'login', 'config', 'backup', 'test', 'wp', 'phpmyadmin', 'sql']
+SENSITIVE_PATTERN = re.compile('|'.join(map(re.escape, SENSITIVE_KEYWORDS)), re.IGNORECASE)
+
+def build_vocabulary(values: pd.Series, token_pattern: re.Pattern = DEFAULT_TOKEN_PATTERN) -> np.ndarray:
+    # 等价于 CountVectorizer(token_pattern=...).fit(values).get_feature_names_out()。
+    # 分析里只用到特征词和矩阵维度，不必构建稀疏矩阵；每个不同的取值也只需分词一次
+    vocab = set()
+    for text in pd.unique(values):
+        vocab.update(token_pattern.findall(text.lower()))
+    return np.array(sorted(vocab), dtype=object)
+
+def sensitive_mask(scripts: pd.Series) -> pd.Series:
+    # 路径中含任一敏感关键词（忽略大小写）的行
+    return scripts.str.contains(SENSITIVE_PATTERN)
+
+def file_names(scripts: pd.Series) -> pd.Series:
+    # 最后一个 '/' 之后的部分，等价于 x.split('/')[-1]
+    return scripts.str.rpartition('/')[2]
+
+def file_extensions(files: pd.Series) -> pd.Series:
+    # 最后一个 '.' 之后的部分，不含 '.' 的文件记为 no_extension
+    parts = files.str.rpartition('.')
+    return parts[2].where(parts[1] != '', 'no_extension')
+
+# to_csv 写时间时只保留需要的精度：全是零点只写日期，否则取秒/毫秒/微秒/纳秒中够用的最粗一级
+DAY_NS = 86400 * 10**9
+TIME_UNITS = [('s', 10**9), ('ms', 10**6), ('us', 10**3)]
 
-def parse_line(line: str):
-    m = log_pattern.search(line)
-    if not m:
-        return None
-    d = m.groupdict()
+def csv_time_type(col):
+    ticks = pc.drop_null(col.cast(pa.timestamp('ns'))).cast(pa.int64()).to_numpy()
+    if (ticks % DAY_NS == 0).all():
+        return pa.date32()
+    for unit, size in TIME_UNITS:
+        if (ticks % size == 0).all():
+            return pa.timestamp(unit)
+    return pa.timestamp('ns')
+
+def csv_column(col):
+    # 还原 category 的字典编码；无时区的时间按 to_csv 的规则选择输出精度
+    if pa.types.is_dictionary(col.type):
+        return col.cast(col.type.value_type)
+    if pa.types.is_timestamp(col.type) and col.type.tz is None:
+        return col.cast(csv_time_type(col))
+    return col
+
+def save_frame(df: pd.DataFrame, csv_path: str, parquet_path: str) -> list:
+    # 返回实际写出的文件
+    if pa is None:
+        df.to_csv(csv_path, index=False)
+        return [csv_path]
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    # Parquet 保留 category 列的字典编码
+    pq.write_table(table, parquet_path, compression='zstd')
+    plain = pa.table({name: csv_column(col) for name, col in zip(table.column_names, table.columns)})
+    # 不加引号，格式与 to_csv 相同；有字段含逗号、引号或换行时 pyarrow 会拒绝，
+    # 此时退回 to_csv，只给需要的字段加引号
+    options = pa_csv.WriteOptions(quoting_style='none', quoting_header='none', eol=os.linesep)
     try:
-        time_dt = datetime.strptime(d["time"], "%a %b %d %H:%M:%S.%f %Y")
-    except Exception:
-        time_dt = None
-    return {
-        "time_raw": d["time"],
-        "time_dt": time_dt,
-        "client_ip": d["ip"],
-        "client_port": d["port"],
-        "script": d["script"]
-    }
+        pa_csv.write_csv(plain, csv_path, write_options=options)
+    except pa.ArrowInvalid:
+        df.to_csv(csv_path, index=False)
+    return [csv_path, parquet_path]
 
 def main():
     # 检查文件是否存在
@@ -39,39 +90,37 @@ def main():
         print(f"当前目录：{os.getcwd()}")
         return
     
-    rows = []
-    with open(LOG_FILE, 'r', encoding='utf-8', errors='ignore') as f:
-        for line in f:
-            r = parse_line(line)
-            if r:
-                rows.append(r)
-    
-    print(f"[+] 成功解析日志行数：{len(rows)}")
+    df = parse_file(LOG_FILE)
+    print(f"[+] 成功解析日志行数：{len(df)}")
     
-    if len(rows) == 0:
+    if len(df) == 0:
         print("警告：没有解析到任何数据！")
         return
     
-    # 构建DataFrame
-    df = pd.DataFrame(rows)
     print(f"[+] DataFrame 形状：{df.shape}")
     
-    # 数据清洗
-    df = df.dropna()
-    df = df.drop_duplicates()
+    # 数据清洗：各字段都由正则必选分组捕获，只有解析失败的 time_dt 可能为空；
+    # time_dt 完全由 time_raw 决定，去重时不必再比较（反之不成立：
+    # 不同写法的 time_raw 可能解析到同一时刻，所以保留 time_raw）
+    df = df.dropna(subset=['client_ip', 'time_dt', 'script'])
+    df = df.drop_duplicates(subset=['time_raw', 'client_ip', 'client_port', 'script'], ignore_index=True)
     print(f"[+] 清洗后日志条目数：{len(df)}")
     
     if len(df) == 0:
         print("警告：清洗后没有数据！")
         return
     
+    # 按清洗后的数据重排类别，去掉不再出现的类别，避免它们以 0 次出现在 value_counts 中
+    df['client_ip'] = as_category(df['client_ip'])
+    df['script'] = as_category(df['script'])
+    
     # 查看前20个脚本路径
     print("\n[+] 前20个解析出的脚本路径：")
     for i, script in enumerate(df['script'].head(20)):
         print(f"{i+1}: {script}")
     
     # 提取文件名
-    df['file'] = df['script'].apply(lambda x: x.split('/')[-1])
+    df['file'] = as_category(file_names(df['script']))
     
     # 统计信息
     print("\n[+] Top 20 客户端 IP：")
@@ -84,8 +133,8 @@ def main():
     print(df['script'].value_counts().head(20))
     
     # 保存结果
-    df.to_csv('error_cleaned.csv', index=False)
-    print("\n[+] 清洗后的日志已保存为 error_cleaned.csv")
+    saved = save_frame(df, 'error_cleaned.csv', 'error_cleaned.parquet')
+    print(f"\n[+] 清洗后的日志已保存为 {'、'.join(saved)}")
     
     # 分析不同的向量化方式
     print("\n" + "="*50)
@@ -94,33 +143,25 @@ def main():
     
     # 方式1：默认向量化（按单词）
     print("\n[方式1] 默认向量化（按单词）：")
-    vectorizer1 = CountVectorizer()
-    X1 = vectorizer1.fit_transform(df['script'])
-    print(f"特征矩阵维度：{X1.shape}")
-    print("前10个特征词：", vectorizer1.get_feature_names_out()[:10])
+    vocab1 = build_vocabulary(df['script'])
+    print(f"特征矩阵维度：{(len(df), len(vocab1))}")
+    print("前10个特征词：", vocab1[:10])
     
     # 方式2：按路径部分向量化
     print("\n[方式2] 按路径部分向量化：")
-    vectorizer2 = CountVectorizer(token_pattern=r'[^/]+')  # 按斜杠分割
-    X2 = vectorizer2.fit_transform(df['script'])
-    print(f"特征矩阵维度：{X2.shape}")
-    print("前10个特征词：", vectorizer2.get_feature_names_out()[:10])
+    vocab2 = build_vocabulary(df['script'], token_pattern=PATH_TOKEN_PATTERN)
+    print(f"特征矩阵维度：{(len(df), len(vocab2))}")
+    print("前10个特征词：", vocab2[:10])
     
     # 方式3：只分析文件名
     print("\n[方式3] 文件名向量化：")
-    vectorizer3 = CountVectorizer()
-    X3 = vectorizer3.fit_transform(df['file'])
-    print(f"特征矩阵维度：{X3.shape}")
-    print("前10个特征词：", vectorizer3.get_feature_names_out()[:10])
+    vocab3 = build_vocabulary(df['file'])
+    print(f"特征矩阵维度：{(len(df), len(vocab3))}")
+    print("前10个特征词：", vocab3[:10])
     
     # 方式4：分析文件扩展名
     print("\n[方式4] 文件扩展名分析：")
-    # 提取文件扩展名
-    def get_extension(filename):
-        parts = filename.split('.')
-        return parts[-1] if len(parts) > 1 else 'no_extension'
-    
-    df['extension'] = df['file'].apply(get_extension)
+    df['extension'] = file_extensions(df['file'])
     print("文件扩展名统计：")
     print(df['extension'].value_counts().head(10))
     
@@ -135,23 +176,17 @@ def main():
     print(f"2. 请求最多的IP：{ip_counts.head(5).to_dict()}")
     
     # 2. 敏感文件检测
-    sensitive_keywords = ['admin', 'login', 'config', 'backup', 'test', 'wp', 'phpmyadmin', 'sql']
-    sensitive_requests = []
-    for script in df['script']:
-        for keyword in sensitive_keywords:
-            if keyword in script.lower():
-                sensitive_requests.append(script)
-                break
+    sensitive_requests = df.loc[sensitive_mask(df['script']), 'script']
     
     print(f"3. 敏感文件请求次数：{len(sensitive_requests)}")
     
     # 3. 异常请求模式
     # 检查短时间内大量请求
     if 'time_dt' in df.columns and not df['time_dt'].isnull().all():
-        df = df.sort_values('time_dt')
-        time_diffs = df['time_dt'].diff().dt.total_seconds()
-        rapid_requests = df[time_diffs < 1]  # 1秒内的连续请求
-        print(f"4. 快速连续请求（<1秒）：{len(rapid_requests)} 次")
+        # 只对时间列排序，不重排整张表；与前一条间隔不足 1 秒即为快速连续请求
+        times = np.sort(df['time_dt'].to_numpy())
+        rapid_count = np.count_nonzero(np.diff(times) < np.timedelta64(1, 's'))
+        print(f"4. 快速连续请求（<1秒）：{rapid_count} 次")
     
     print("\n[✓] 分析完成！")
 
@@ -0,0 +1,58 @@
+import io
+
+import pandas as pd
+
+import log_parser
+from log_parser import as_category
+
+# 两条可解析的行夹着无关行，CRLF 换行与实际日志一致
+LOG = (
+    b"[Mon Sep 29 14:38:42.123456 2025] [:error] [pid 1:tid 2] AH00128: File does not exist\r\n"
+    b"[Mon Sep 29 14:38:42.123456 2025] [:error] [pid 12:tid 34] [client 10.0.0.5:51234] "
+    b"script '/var/www/admin/login.php' not found or unable to stat\r\n"
+    b"junk line\r\n"
+    b"[Mon Sep 29 14:38:43.000001 2025] [:error] [pid 12:tid 34] [client 10.0.0.7:51235] "
+    b"script '/var/www/wp/index.php' not found or unable to stat\r\n"
+)
+EXPECTED = [
+    ("Mon Sep 29 14:38:42.123456 2025", "10.0.0.5", "51234", "/var/www/admin/login.php"),
+    ("Mon Sep 29 14:38:43.000001 2025", "10.0.0.7", "51235", "/var/www/wp/index.php"),
+]
+
+def rows(df: pd.DataFrame) -> list:
+    return list(df[["time_raw", "client_ip", "client_port", "script"]].astype(str).itertuples(index=False, name=None))
+
+def test_parse_file(tmp_path):
+    path = tmp_path / "error.log"
+    path.write_bytes(LOG)
+    df = log_parser.parse_file(str(path), jobs=1)
+    assert rows(df) == EXPECTED
+    assert df["time_dt"].notna().all()
+    assert isinstance(df["client_ip"].dtype, pd.CategoricalDtype)
+
+def test_parse_chunk_boundaries(tmp_path):
+    # 任意切分字节区间，每一行都恰好被解析一次
+    path = tmp_path / "error.log"
+    path.write_bytes(LOG)
+    for n in (2, 3, 7, len(LOG)):
+        bounds = [len(LOG) * i // n for i in range(n + 1)]
+        parts = [log_parser.parse_chunk(str(path), s, e) for s, e in zip(bounds, bounds[1:])]
+        assert rows(pd.concat(parts, ignore_index=True)) == EXPECTED
+
+def test_parse_stream(monkeypatch):
+    monkeypatch.setattr(log_parser, "READ_BLOCK_SIZE", 16)
+    assert rows(log_parser.parse_stream(io.BytesIO(LOG))) == EXPECTED
+
+def test_parse_empty_file(tmp_path):
+    path = tmp_path / "error.log"
+    path.write_bytes(b"")
+    assert len(log_parser.parse_file(str(path))) == 0
+
+def test_as_category_keeps_first_appearance_order():
+    # 计数相同时 value_counts 的先后应与普通字符串列一致
+    values = pd.Series(["10.0.0.7", "10.0.0.5", "10.0.0.5", "10.0.0.7", "10.0.0.9", "10.0.0.1"])
+    expected = list(values.value_counts().index)
+    assert list(as_category(values).value_counts().index) == expected
+    # 已是 category 的列会重排类别并去掉未出现的类别
+    cleaned = as_category(values.astype('category')[values != "10.0.0.9"])
+    assert list(cleaned.cat.categories) == ["10.0.0.7", "10.0.0.5", "10.0.0.1"]
@@ -0,0 +1,90 @@
+import pandas as pd
+import pytest
+
+import parse_logs
+
+def frame(times, scripts=None):
+    # 与 main() 保存时的列结构一致：含 category 列和时间列
+    n = len(times)
+    scripts = scripts or [f"/var/www/a/f{i}.php" for i in range(n)]
+    df = pd.DataFrame({
+        "time_raw": times,
+        "time_dt": pd.to_datetime(times, format="ISO8601"),
+        "client_ip": pd.Categorical(["10.0.0.5"] * n),
+        "client_port": [str(51234 + i) for i in range(n)],
+        "script": pd.Categorical(scripts),
+    })
+    df["file"] = df["script"].str.rpartition("/")[2].astype("category")
+    return df
+
+@pytest.mark.parametrize("times", [
+    ["2025-09-29 14:38:42.000000", "2025-09-29 14:38:43.000000"],
+    ["2025-09-29 14:38:42.123456", "2025-09-29 14:38:43.000000"],
+    ["2025-09-29 14:38:42.123000", "2025-09-29 14:38:43.000000"],
+    ["2025-09-29 00:00:00.000000", "2025-09-30 00:00:00.000000"],
+])
+def test_save_frame_matches_to_csv(tmp_path, times):
+    pytest.importorskip("pyarrow")
+    df = frame(times)
+    csv_path, parquet_path = tmp_path / "out.csv", tmp_path / "out.parquet"
+    df.to_csv(tmp_path / "expected.csv", index=False)
+    assert parse_logs.save_frame(df, str(csv_path), str(parquet_path)) == [str(csv_path), str(parquet_path)]
+    assert csv_path.read_bytes() == (tmp_path / "expected.csv").read_bytes()
+
+def test_save_frame_quotes_like_to_csv(tmp_path):
+    pytest.importorskip("pyarrow")
+    # 含逗号、引号的字段 pyarrow 不加引号写不出，应退回 to_csv
+    df = frame(["2025-09-29 14:38:42.123456", "2025-09-29 14:38:43.000000"],
+               scripts=["/var/www/a,b.php", "/var/www/\"q\".php"])
+    csv_path = tmp_path / "out.csv"
+    df.to_csv(tmp_path / "expected.csv", index=False)
+    parse_logs.save_frame(df, str(csv_path), str(tmp_path / "out.parquet"))
+    assert csv_path.read_bytes() == (tmp_path / "expected.csv").read_bytes()
+
+def test_save_frame_without_pyarrow(tmp_path, monkeypatch):
+    monkeypatch.setattr(parse_logs, "pa", None)
+    df = frame(["2025-09-29 14:38:42.123456"])
+    csv_path = tmp_path / "out.csv"
+    assert parse_logs.save_frame(df, str(csv_path), str(tmp_path / "out.parquet")) == [str(csv_path)]
+    assert not (tmp_path / "out.parquet").exists()
+
+SCRIPTS = pd.Series(pd.Categorical([
+    "/var/www/Admin/Login.PHP", "/var/www/a/b/x.php", "/var/www/wp-admin/setup-config.php",
+    "/cgi-bin/test_1.cgi", "/var/www/a/b/x.php", "/x", "/var/www/html/phpMyAdmin/index.php",
+]))
+
+@pytest.mark.parametrize("token_pattern", ["DEFAULT_TOKEN_PATTERN", "PATH_TOKEN_PATTERN"])
+def test_build_vocabulary_matches_count_vectorizer(token_pattern):
+    text = pytest.importorskip("sklearn.feature_extraction.text")
+    pattern = getattr(parse_logs, token_pattern)
+    vectorizer = text.CountVectorizer(token_pattern=pattern.pattern)
+    X = vectorizer.fit_transform(SCRIPTS)
+    vocab = parse_logs.build_vocabulary(SCRIPTS, token_pattern=pattern)
+    assert (len(SCRIPTS), len(vocab)) == X.shape
+    assert list(vocab) == list(vectorizer.get_feature_names_out())
+
+def test_file_names_and_extensions_match_split():
+    # 与原先逐行 split 的结果一致，包括隐藏文件、以 '.' 结尾和不含 '.' 的文件名
+    scripts = pd.Series(pd.Categorical([
+        "/var/www/a/login.php", "/var/www/.hidden", "/var/www/trailing.", "/var/www/README",
+        "/var/www/x.tar.gz", "/var/www/dir/", "noslash.cgi",
+    ]))
+    files = parse_logs.file_names(scripts)
+    assert list(files) == [s.split('/')[-1] for s in scripts]
+    def get_extension(filename):
+        parts = filename.split('.')
+        return parts[-1] if len(parts) > 1 else 'no_extension'
+    expected = [get_extension(f) for f in files]
+    assert list(parse_logs.file_extensions(files)) == expected
+    assert list(parse_logs.file_extensions(files.astype("category"))) == expected
+    assert expected[1:4] == ["hidden", "", "no_extension"]
+
+def test_sensitive_mask_matches_keyword_loop():
+    # 与原先逐个关键词、script.lower() 子串判断的结果一致
+    scripts = pd.Series(pd.Categorical([
+        "/var/www/Admin/index.php", "/var/www/html/phpMyAdmin/", "/WP-LOGIN.php", "/a/b.php",
+        "/backup.SQL", "/var/www/latest.php", "/config", "/index.html", "/a/b.php",
+    ]))
+    expected = [any(k in s.lower() for k in parse_logs.SENSITIVE_KEYWORDS) for s in scripts]
+    assert list(parse_logs.sensitive_mask(scripts)) == expected
+    assert expected.count(True) == 6